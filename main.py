@@ -1,80 +1,47 @@
-from enum import Enum
-from typing import List, Optional, Set, Union
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Set, Union
 
-from fastapi import Body, Cookie, FastAPI, Form, Header, Path, Query
-from pydantic import BaseModel, EmailStr, Field, HttpUrl
-
-class BaseItem(BaseModel):
-    description: str
-    type: str
-
-class CarItem(BaseItem):
-    type = "car"
-
-class PlaneItem(BaseItem):
-    type = "plane"
-
-class Image(BaseModel):
-    url: HttpUrl
-    name: str
-
-class Item(BaseModel):
-    name: str
-    description: Optional[str] = Field(
-        None, title="The description of the item", max_length=300
-    )
-    price: float = Field(..., gt=0, description="The price must be greater than zero")
-    tax: float = 10.5
-    tags: List[str] = []
-    image: Optional[List[Image]] = None
-
-    class Config:
-        schema_extra = {
-            "example": {
-                "name": "Foo",
-                "description": "A very nice Item",
-                "price": 35.4,
-                "tax": 3.2,
-                "tags": [],
-                "image": [
-                    {
-                        "url": "string",
-                        "name": "string"
-                    }
-                ]
-            }
-        }
-
-class ModelName(str, Enum):
-    alexnet = "alexnet"
-    resnet = "resnet"
-    lenet = "lenet"
-
-class Offer(BaseModel):
-    name: str
-    description: Optional[str] = None
-    price: float
-    items: List[Item]
-
-class UserBase(BaseModel):
-    username: str
-    email: EmailStr
-    full_name: Optional[str] = None
-
-class UserIn(UserBase):
-    password: str
+import orjson
+from fastapi import (
+    Body, Cookie, FastAPI, Form, Header, HTTPException, Path, Query, Request, Response
+)
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import parse_obj_as
 
-class UserOut(UserBase):
-    pass
+from schemas import (
+    CarItem, Image, Item, ModelName, Offer, PlaneItem, UserIn, UserInDB, UserOut
+)
 
-class UserInDB(UserBase):
-    hashed_password: str
+class ORJSONRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
 
+# Decode request bodies straight from bytes with orjson instead of the
+# stdlib json module; validation still happens against the models in schemas
+class ORJSONRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
 
+        async def custom_route_handler(request: Request) -> Response:
+            request = ORJSONRequest(request.scope, request.receive)
+            return await original_route_handler(request)
 
+        return custom_route_handler
 
+# orjson rejects ints wider than 64 bits, which int params happily accept,
+# so those responses fall back to the stdlib encoder instead of a 500
+class SafeORJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            return JSONResponse.render(self, content)
 
-app = FastAPI()
+app = FastAPI(default_response_class=SafeORJSONResponse)
+app.router.route_class = ORJSONRoute
 
 fake_items_db = [{"item_name": "Foo"}, {"item_name": "Bar"}, {"item_name": "Baz"}]
 
@@ -92,12 +59,43 @@ vehicle_items = {
     },
 }
 
+# items and vehicle_items never change, so validate and encode every view
+# of them once at import; the GET routes below only look up the bytes
+def _build_item_json_cache() -> dict:
+    cache = {}
+    for key, value in items.items():
+        item = Item(**value)
+        cache[(key, "full")] = orjson.dumps(item.dict(exclude_unset=True))
+        cache[(key, "name")] = orjson.dumps(item.dict(include={"name", "description"}))
+        cache[(key, "public")] = orjson.dumps(item.dict(exclude={"tax"}))
+    return cache
+
+_ITEM_JSON_CACHE = _build_item_json_cache()
+
+_VEHICLE_JSON_CACHE = {
+    key: orjson.dumps(parse_obj_as(Union[PlaneItem, CarItem], value).dict())
+    for key, value in vehicle_items.items()
+}
+
+# A returned Response is sent as-is, so routes serving cached bytes keep
+# response_model only for the docs; the bytes are never revalidated
+def cached_json_response(cache: dict, key: Any) -> Response:
+    try:
+        content = cache[key]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Item not found") from None
+    return Response(content=content, media_type="application/json")
+
 def fake_password_hasher(raw_password: str):
     return "supersecret" + raw_password
 
-def fake_save_user(user_in: UserIn):
+def fake_save_user(user_in: UserIn) -> UserInDB:
     hashed_pasword = fake_password_hasher(user_in.password)
-    user_in_db = UserInDB(**user_in.dict(), hashed_password=hashed_pasword)
+    # user_in is already validated, so build UserInDB without revalidating it
+    data = user_in.__dict__.copy()
+    del data["password"]
+    data["hashed_password"] = hashed_pasword
+    user_in_db = UserInDB.construct(**data)
     print("User saved! ...not really")
     return user_in_db
 """
@@ -112,9 +110,17 @@ If query param required, don't declare a default value
 """
 ########## GET ##########
 
+# constant bodies are encoded once at import instead of on every request
+_ROOT = orjson.dumps({"message": "Welcome Home!"})
+_USER_ME = orjson.dumps({"user_id": "the current user"})
+
 @app.get("/")
 async def root():
-    return {"message": "Welcome Home!"}
+    return Response(content=_ROOT, media_type="application/json")
+
+_ITEMS_PAYLOAD = ({"item_id": "Foo"}, {"item_id": "Bar"})
+_CACHED_RESULTS = {"items": _ITEMS_PAYLOAD}
+_CACHED_RESULTS_JSON = orjson.dumps(_CACHED_RESULTS)
 
 # Optional[str] = Query(None, some_other_arg) makes Query optional,
 # using ... as the first arg in query means it is required
@@ -132,35 +138,36 @@ async def read_items(
     ),
     user_agent: Optional[str] = Header(None),
 ):
-    results = {"items": [{"item_id": "Foo"}, {"item_id": "Bar"}]}
+    # with nothing to add, the body is the same for every request
+    if not (user_agent or ads_id or q):
+        return Response(content=_CACHED_RESULTS_JSON, media_type="application/json")
+    results = _CACHED_RESULTS.copy()
     if user_agent:
-        results.update({"User-Agent": user_agent})
+        results["User-Agent"] = user_agent
     if ads_id:
-        results.update(({"ads_id": ads_id}))
+        results["ads_id"] = ads_id
     if q:
-        results.update({"q": q})
-    return results
+        results["q"] = q
+    return SafeORJSONResponse(content=results)
 
 # the function param q will be optional, and None by default
-@app.get("/items/{item_id}", response_model=Item, response_model_exclude_unset=True)
+@app.get("/items/{item_id}", response_model=Item)
 async def read_item_id(item_id: str):
-    return items[item_id]
+    return cached_json_response(_ITEM_JSON_CACHE, (item_id, "full"))
 
-@app.get(
-    "/items/{item_id}/name",
-    response_model=Item,
-    response_model_include={"name", "description"},
-)
+@app.get("/items/{item_id}/name", response_model=Item)
 async def read_item_name(item_id: str):
-    return items[item_id]
+    return cached_json_response(_ITEM_JSON_CACHE, (item_id, "name"))
 
-@app.get("/items/{item_id}/public", response_model=Item, response_model_exclude={"tax"})
+@app.get("/items/{item_id}/public", response_model=Item)
 async def read_item_public_data(item_id: str):
-    return items[item_id]
+    return cached_json_response(_ITEM_JSON_CACHE, (item_id, "public"))
 
 @app.get("/users/me")
 async def read_user_me():
-    return {"user_id": "the current user"}
+    return Response(content=_USER_ME, media_type="application/json")
+
+_LONG_DESC = "This is an amazing item that has a long description"
 
 @app.get("/users/{user_id}/items/{items_id}")
 async def read_user_item(
@@ -168,38 +175,46 @@ async def read_user_item(
 ):
     item = {"item_id": item_id, "needy": needy, "owner_id": user_id}
     if q:
-        item.update({"q": q})
+        item["q"] = q
     if not short:
-        item.update(
-            {"description": "This is an amazing item that has a long description"}
-        )
-    return item
+        item["description"] = _LONG_DESC
+    return SafeORJSONResponse(content=item)
 
 
 
+_MODEL_MSGS = {
+    ModelName.alexnet: "Deep Learning FTW!",
+    ModelName.lenet: "LeCNN all the images",
+    ModelName.resnet: "Have some residuals",
+}
+_MODEL_JSON = {
+    model_name: orjson.dumps({"model_name": model_name.value, "message": message})
+    for model_name, message in _MODEL_MSGS.items()
+}
+
 @app.get("/models/{model_name}")
 # Declare path parameter with a type annotation using the enum class ModelName
 async def get_model(model_name: ModelName):
-    if model_name == ModelName.alexnet:
-        return {"model_name": model_name, "message": "Deep Learning FTW!"}
-    if model_name.value == "lenet":
-        return {"model_name": model_name, "message": "LeCNN all the images"}
-    return {"model_name": model_name, "message": "Have some residuals"}
+    return Response(content=_MODEL_JSON[model_name], media_type="application/json")
+
+@lru_cache(maxsize=1024)
+def _file_json(file_path: str) -> bytes:
+    return orjson.dumps({"file_path": file_path})
 
 # PATH CONVERTER
 @app.get("/files/{file_path:path}")
 async def read_file(file_path: str):
-    return {"file_path": file_path}
+    return Response(content=_file_json(file_path), media_type="application/json")
 
 @app.get("/vehicle_items/{item_id}", response_model=Union[PlaneItem, CarItem])
 async def read_vehicle_item(item_id: str):
-    return vehicle_items[item_id]
+    return cached_json_response(_VEHICLE_JSON_CACHE, item_id)
 
 ########## POST ##########
 
 @app.post("/images/multiple/")
 async def create_multiple_images(images: List[Image]):
-    return images
+    return ORJSONResponse(content=[image.dict() for image in images])
 
 @app.post("/items/", status_code=201)
 async def create_item(name: str):
@@ -211,7 +226,7 @@ async def login(username: str = Form(...), password: str = Form(...)):
 
 @app.post("/offers")
 async def create_offer(offer: Offer):
-    return offer
+    return ORJSONResponse(content=offer.dict())
 
 @app.post("/user/", response_model=UserOut)
 async def create_user(user_in: UserIn):
@@ -223,9 +238,11 @@ async def create_user(user_in: UserIn):
 ########## PUT ##########
 
 # Declare body, path and query params, all at the same time.
+# Returning the response directly means the results dict is encoded once
+# and dropped, rather than copied again by jsonable_encoder
 @app.put("/items/{item_id}")
 async def update_item(item_id: int, item: Item):
-    results = {"item_id": item_id, "item": item}
-    return results
+    results = {"item_id": item_id, "item": item.dict()}
+    return SafeORJSONResponse(content=results)
 
 
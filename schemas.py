@@ -0,0 +1,83 @@
+import re
+from enum import Enum
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, EmailStr, Field, validator
+
+class BaseItem(BaseModel):
+    description: str
+    type: str
+
+class CarItem(BaseItem):
+    type = "car"
+
+class PlaneItem(BaseItem):
+    type = "plane"
+
+_URL_RE = re.compile(r"https?://\S+", re.ASCII | re.IGNORECASE)
+
+class Image(BaseModel):
+    # a plain str checked against one compiled regex is much cheaper than
+    # HttpUrl's full parse, which adds up on List[Image] bodies
+    url: str = Field(..., format="uri")
+    name: str
+
+    @validator("url")
+    def check_url(cls, v):
+        if not _URL_RE.fullmatch(v):
+            raise ValueError("invalid URL")
+        return v
+
+class Item(BaseModel):
+    name: str
+    description: Optional[str] = Field(
+        None, title="The description of the item", max_length=300
+    )
+    price: float = Field(..., gt=0, description="The price must be greater than zero")
+    tax: float = 10.5
+    # an empty tuple default is immutable, so pydantic shares it between
+    # instances instead of copying a fresh list for each one
+    tags: Tuple[str, ...] = ()
+    image: Optional[List[Image]] = None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "name": "Foo",
+                "description": "A very nice Item",
+                "price": 35.4,
+                "tax": 3.2,
+                "tags": [],
+                "image": [
+                    {
+                        "url": "string",
+                        "name": "string"
+                    }
+                ]
+            }
+        }
+
+class ModelName(str, Enum):
+    alexnet = "alexnet"
+    resnet = "resnet"
+    lenet = "lenet"
+
+class Offer(BaseModel):
+    name: str
+    description: Optional[str] = None
+    price: float
+    items: List[Item]
+
+class UserBase(BaseModel):
+    username: str
+    email: EmailStr
+    full_name: Optional[str] = None
+
+class UserIn(UserBase):
+    password: str
+
+class UserOut(UserBase):
+    pass
+
+class UserInDB(UserBase):
+    hashed_password: str